@@ -149,9 +149,9 @@ def buildProteinResidue( residueDict, atoms, bondInfo, abbr, loc, tinkerLookupNa
                     residueDict[abbr]['atoms'][bondedAtom]['bonds'][atom] = 1
                     residueDict[abbr]['atoms'][atom]['bonds'][bondedAtom] = 1
                 else:
-                    print "Error: bonded atom=%s not in residue=%s" % ( atom, abbr )
+                    print("Error: bonded atom=%s not in residue=%s" % ( atom, abbr ))
         else:
-            print "Error: bonded atom=%s nt in residue=%s" % ( atom, abbr )
+            print("Error: bonded atom=%s nt in residue=%s" % ( atom, abbr ))
 
     return
 
@@ -204,7 +204,7 @@ def copyProteinResidue( residue ):
 def buildResidueDict( residueXmlFileName ):
 
     residueTree = etree.parse(residueXmlFileName)
-    print "Read %s" % (residueXmlFileName)
+    print("Read %s" % (residueXmlFileName))
     root        = residueTree.getroot()
     residueDict = dict()
 
@@ -262,7 +262,7 @@ def buildResidueDict( residueXmlFileName ):
                     residueDict[cResidueName]['tinkerLookupName']                 = 'C-Terminal ' + 'HIS ' + sub
                 else:
                     residueDict[cResidueName]['tinkerLookupName']                 = 'C-Terminal ' + abbr + ' ' + sub
-                print "tinkerLookupName %s %s" % ( abbr, residueDict[cResidueName]['tinkerLookupName'])
+                print("tinkerLookupName %s %s" % ( abbr, residueDict[cResidueName]['tinkerLookupName']))
             else:
                 residueDict[cResidueName]['tinkerLookupName']                 = 'C-Terminal ' + abbr
             residueDict[cResidueName]['atoms']['OXT']                         = copyAtom( residueDict[abbr]['atoms']['O'] )
@@ -296,10 +296,10 @@ def buildResidueDict( residueXmlFileName ):
 
             buildProteinResidue( residueDict, atoms, bondInfo, abbr, loc, tinkerName, 1, residueName, type )
 
-    print "Start Lookup XML FFFFinal\n\n"
+    print("Start Lookup XML FFFFinal\n\n")
     printXml = 1
     if( printXml ):
-        print "<Residues>"
+        print("<Residues>")
         for resName in sorted( residueDict.keys() ):
             if( 'include' in residueDict[resName] and residueDict[resName]['include'] ):
                 type         = residueDict[resName]['type']
@@ -307,13 +307,13 @@ def buildResidueDict( residueXmlFileName ):
                 tinkerLookupName   = residueDict[resName]['tinkerLookupName']
                 fullName     = residueDict[resName]['residueName']
                 outputString = """  <Residue abbreviation="%s" loc="%s" type="%s" tinkerLookupName="%s" fullName="%s">""" % (resName, loc, type, tinkerLookupName, fullName )
-                print "%s" % outputString
+                print("%s" % outputString)
 
                 atomsInfo    = residueDict[resName]['atoms']
                 for atomName in sorted( atomsInfo.keys() ):
                     tinkerLookupName = atomsInfo[atomName]['tinkerLookupName']
                     outputString = """  <Atom name="%s" tinkerLookupName="%s" />""" % (atomName, tinkerLookupName)
-                    print "%s" % outputString
+                    print("%s" % outputString)
 
                 includedBonds = dict()
                 for atomName in sorted( atomsInfo.keys() ):
@@ -327,9 +327,9 @@ def buildResidueDict( residueXmlFileName ):
                                 includedBonds[bondedAtom] = dict()
                             includedBonds[atomName][bondedAtom] = 1
                             includedBonds[bondedAtom][atomName] = 1
-                            print "%s" % outputString
-                print "</Residue>"
-        print "</Residues>"
+                            print("%s" % outputString)
+                print("</Residue>")
+        print("</Residues>")
 
     return residueDict
 
@@ -363,13 +363,13 @@ def setBioTypes( bioTypes, residueDict ):
             if lookupName in bioTypes:
                 res['atoms'][atom]['type'] = bioTypes[lookupName][3]
             else:
-                print "For %s lookupName=%s not in biotype" % (atom,lookupName)
+                print("For %s lookupName=%s not in biotype" % (atom,lookupName))
                 if( 'parent' in res ):
                     lookupName =  res['atoms'][atom]['tinkerLookupName']  + '_' +  res['parent']['tinkerLookupName']
                     if( lookupName in bioTypes ):
                         res['atoms'][atom]['type'] = bioTypes[lookupName][3]
                     else:
-                        print "Missing lookupName=%s from biotype" % (lookupName)
+                        print("Missing lookupName=%s from biotype" % (lookupName))
     return 0
 
 #=============================================================================================
@@ -573,7 +573,7 @@ while lineIndex < len( allLines ):
         scalars[fields[0]] = fields[1]
         lineIndex += 1
     else:
-        print "Field %s not recognized: line=<%s>" % ( fields[0], allLines[lineIndex] )
+        print("Field %s not recognized: line=<%s>" % ( fields[0], allLines[lineIndex] ))
         lineIndex += 1
 
 #=============================================================================================
@@ -589,12 +589,12 @@ setBioTypes( bioTypes, residueDict )
 tinkerXmlFileName           = scalars['forcefield']
 tinkerXmlFileName          += '.xml'
 tinkerXmlFile               = open( tinkerXmlFileName, 'w' )
-print "Opened %s." % (tinkerXmlFileName)
+print("Opened %s." % (tinkerXmlFileName))
 
 gkXmlFileName              = scalars['forcefield']
 gkXmlFileName             += '_gk.xml'
 gkXmlFile                  = open( gkXmlFileName, 'w' )
-print "Opened %s." % (gkXmlFileName)
+print("Opened %s." % (gkXmlFileName))
 
 today = datetime.date.today().isoformat()
 sourceFile = os.path.basename(sys.argv[1])
@@ -680,7 +680,7 @@ for resname, res in sorted(residueDict.items()):
             type  = res['atoms'][atom]['type']
             typeI = int( type )
             if( typeI < 0 ):
-                print "Error: type=%s for atom=%s of residue=%s" % (type, atom, resname)
+                print("Error: type=%s for atom=%s of residue=%s" % (type, atom, resname))
             tag  = "   <Atom name=\"%s\" type=\"%s\" />" % (atom, type)
             atomIndex[atom]  = atomCount
             atomCount       += 1
@@ -755,7 +755,7 @@ tinkerXmlFile.write('  </Residue>\n')
 
 # ions
  
-for ion,ionInfo in ions.iteritems():
+for ion,ionInfo in ions.items():
     outputString  = """  <Residue name="%s">\n""" % (ionInfo[0])
     outputString += """   <Atom name="%s" type="%s"/>\n""" % (ionInfo[0], str(ionInfo[1]))
     outputString += """  </Residue>\n""" 
@@ -906,7 +906,7 @@ if( isAmoeba ):
        outputString  = """  <TorsionTorsionGrid grid="%s" nx="%s" ny="%s" >""" % (str(index), torInfo[5], torInfo[6] )
        tinkerXmlFile.write( "%s\n" % (outputString ) )
        for (gridIndex, gridEntry) in enumerate(grid):
-           print "Gxx %d  %s" % ( gridIndex, str(gridEntry) )
+           print("Gxx %d  %s" % ( gridIndex, str(gridEntry) ))
            if( len( gridEntry ) > 5 ):
                f   = float( gridEntry[2] )*4.184
                fx  = float( gridEntry[3] )*4.184
@@ -1013,11 +1013,11 @@ if( isAmoeba ):
           
        outputString     += "/>"
        tinkerXmlFile.write( "%s\n" % (outputString ) )
-       print m[polarize[0]]
+       print(m[polarize[0]])
     for t in sorted(m):
         for k in m[t]:
             if t not in m[k]:
-                print t, k
+                print(t, k)
 
     tinkerXmlFile.write( " </AmoebaMultipoleForce>\n" )
 
@@ -1037,10 +1037,10 @@ if( isAmoeba ):
     # radii are set in forcefield.py
 
     for type in sorted( atomTypes ):
-        print "atom type=%s  %s" % ( str(type), str(atomTypes[type]) )
+        print("atom type=%s  %s" % ( str(type), str(atomTypes[type]) ))
 
     for type in sorted( bioTypes ):
-        print "bio type=%s  %s" % ( str(type), str(bioTypes[type]) )
+        print("bio type=%s  %s" % ( str(type), str(bioTypes[type]) ))
 
     multipoleArray       = forces['multipole']
     for multipoleInfo in multipoleArray:
@@ -1067,9 +1067,9 @@ if( isAmoeba ):
            elif( element == 'Fe' ):
                shct = 0.88
            else:
-               print "Warning no overlap scale factor for type=%d element=%s" % (type, element)
+               print("Warning no overlap scale factor for type=%d element=%s" % (type, element))
        else:
-           print "Warning no overlap scale factor for type=%d " % (type)
+           print("Warning no overlap scale factor for type=%d " % (type))
 
        outputString      = """  <GeneralizedKirkwood type="%s" charge="%s" shct="%s"  /> """ % ( axisInfo[0], multipoles[0],  str(shct) )
        gkXmlFile.write( "%s\n" % (outputString ) )
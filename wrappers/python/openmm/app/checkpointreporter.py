@@ -32,11 +32,62 @@ from __future__ import absolute_import
 __author__ = "Robert McGibbon"
 __version__ = "1.0"
 
+import mmap
 import os
 import os.path
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import zstandard
+    have_zstd = True
+except: have_zstd = False
+
+try:
+    import lz4.frame
+    have_lz4 = True
+except: have_lz4 = False
 
 __all__ = ['CheckpointReporter']
 
+# Block size used when comparing a new checkpoint to the previous one in delta mode
+_DELTA_CHUNK_SIZE = 64*1024
+
+# Header written at the start of compressed checkpoints, followed by a one byte codec id
+_COMPRESSED_MAGIC = b'OMMC'
+_CODEC_ZSTD = 1
+_CODEC_LZ4 = 2
+
+# Maximum number of bytes passed to a single os.write() call
+_WRITE_CHUNK_SIZE = 4*1024*1024
+
+
+def _rawWrite(fd, chk):
+    """Write data to an empty file through an unbuffered file descriptor."""
+    data = memoryview(chk)
+    size = len(data)
+    written = 0
+    while written < size:
+        written += os.write(fd, data[written:written+_WRITE_CHUNK_SIZE])
+    os.fsync(fd)
+
+
+def _decompressCheckpoint(data):
+    """If data was compressed by a CheckpointReporter, return the original
+    checkpoint.  Otherwise return data unchanged."""
+    header = len(_COMPRESSED_MAGIC)
+    if data[:header] != _COMPRESSED_MAGIC or len(data) <= header:
+        return data
+    codec = data[header]
+    if codec == _CODEC_ZSTD:
+        if not have_zstd:
+            raise RuntimeError("Cannot load checkpoint because Python could not import zstandard library")
+        return zstandard.ZstdDecompressor().decompress(data[header+1:])
+    if codec == _CODEC_LZ4:
+        if not have_lz4:
+            raise RuntimeError("Cannot load checkpoint because Python could not import lz4 library")
+        return lz4.frame.decompress(data[header+1:])
+    raise ValueError('Unknown checkpoint compression codec: %d' % codec)
+
 
 class CheckpointReporter(object):
     """CheckpointReporter saves periodic checkpoints of a simulation.
@@ -50,6 +101,10 @@ class CheckpointReporter(object):
     >>> with open('checkput.chk', 'rb') as f:
     >>>     simulation.context.loadCheckpoint(f.read())
 
+    If the reporter was created with compression enabled, the file must
+    instead be loaded with Simulation.loadCheckpoint(), which detects and
+    decompresses it automatically.
+
     Notes:
     A checkpoint contains not only publicly visible data such as the particle
     positions and velocities, but also internal data such as the states of
@@ -70,19 +125,85 @@ class CheckpointReporter(object):
     throwing an exception.
 
     """
-    def __init__(self, file, reportInterval):
+
+    # A checkpoint does not need any data from the State
+    _FLAGS = (False, False, False, False)
+
+    def __init__(self, file, reportInterval, delta=False, asynchronous=False, compress=None, mapped=False):
         """Create a CheckpointReporter.
 
         Parameters
         ----------
-        file : string or open file object
+        file : string, os.PathLike, or open file object
             The file to write to. Any current contents will be overwritten.
         reportInterval : int
             The interval (in time steps) at which to write checkpoints.
+        delta : bool=False
+            If True and file is an open file object, only the blocks of the
+            checkpoint that differ from the previously written one are
+            rewritten.  This reduces the amount of data written when most of
+            a large checkpoint stays the same between reports.  The file must
+            not be modified by anything else while the reporter is in use.
+        asynchronous : bool=False
+            If True, checkpoints are written to disk on a background thread so
+            the simulation can continue while the data is being written.  Each
+            report waits for the previous write to finish before starting a
+            new one, and any error raised while writing is reported at that
+            point.  Call flush() to wait for the most recent checkpoint to be
+            written, and close() when the reporter is no longer needed.
+        compress : string=None
+            The compression to apply to checkpoints before writing them.  May
+            be 'zstd' (requires the zstandard package), 'lz4' (requires the
+            lz4 package), or None for no compression.  Compressed files cannot
+            be passed directly to Context.loadCheckpoint().  Load them with
+            Simulation.loadCheckpoint() instead.
+        mapped : bool=False
+            If True and file is a filename, checkpoints are created directly in
+            a memory mapping of the temporary file they are written to, which
+            avoids copying them through an intermediate buffer.  Space for the
+            file is reserved with os.posix_fallocate() first, so running out of
+            disk space raises an exception rather than crashing.  On
+            filesystems that do not support fallocate natively this reservation
+            writes every block, so only enable it on local filesystems.  This
+            is ignored for asynchronous or compressed reporters, on platforms
+            without posix_fallocate(), and when other CheckpointReporters are
+            attached to the same Simulation.
         """
 
         self._reportInterval = reportInterval
+        self._nextReport = 0
+        givenPath = isinstance(file, (str, os.PathLike))
+        if givenPath:
+            file = os.fsdecode(file)
+            self._reportImpl = self._reportFilePath
+        else:
+            self._reportImpl = self._reportFileObject
         self._file = file
+        self._delta = delta
+        self._mapped = mapped and givenPath and compress is None and not asynchronous and hasattr(os, 'posix_fallocate')
+        self._mappedSize = 0
+        self._lastCheckpoint = None
+        self._buffer = bytearray()
+        self._pending = None
+        if compress is None:
+            self._compressor = None
+        elif compress == 'zstd':
+            if not have_zstd:
+                raise RuntimeError("Cannot compress checkpoints with zstd because Python could not import zstandard library")
+            compressor = zstandard.ZstdCompressor(level=1, threads=-1)
+            header = _COMPRESSED_MAGIC+bytes([_CODEC_ZSTD])
+            self._compressor = lambda chk: header+compressor.compress(chk)
+        elif compress == 'lz4':
+            if not have_lz4:
+                raise RuntimeError("Cannot compress checkpoints with lz4 because Python could not import lz4 library")
+            header = _COMPRESSED_MAGIC+bytes([_CODEC_LZ4])
+            self._compressor = lambda chk: header+lz4.frame.compress(chk)
+        else:
+            raise ValueError('Unknown compression method: %s' % compress)
+        if asynchronous:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        else:
+            self._executor = None
 
     def describeNextReport(self, simulation):
         """Get information about the next report this object will generate.
@@ -100,8 +221,14 @@ class CheckpointReporter(object):
             that report will require positions, velocities, forces, and
             energies respectively.
         """
-        steps = self._reportInterval - simulation.currentStep%self._reportInterval
-        return (steps, False, False, False, False)
+        steps = self._nextReport - simulation.currentStep
+        if steps <= 0 or steps > self._reportInterval:
+            # The step we were waiting for has been reached (or currentStep was
+            # changed), so compute the next one.
+
+            self._nextReport = (simulation.currentStep//self._reportInterval + 1)*self._reportInterval
+            steps = self._nextReport - simulation.currentStep
+        return (steps,) + self._FLAGS
 
     def report(self, simulation, state):
         """Generate a report.
@@ -113,24 +240,203 @@ class CheckpointReporter(object):
         state : State
             The current state of the simulation
         """
-        if isinstance(self._file, str):
-            # Do a safe save.
-
-            tempFilename1 = self._file+".backup1"
-            tempFilename2 = self._file+".backup2"
-            with open(tempFilename1, 'w+b', 0) as out:
-                out.write(simulation.context.createCheckpoint())
-            exists = os.path.exists(self._file)
-            if exists:
-                os.rename(self._file, tempFilename2)
-            os.rename(tempFilename1, self._file)
-            if exists:
-                os.remove(tempFilename2)
+        # Wait for the previous checkpoint to be written.
+
+        self.flush()
+        context = simulation.context
+
+        # Simulation passes the same State to every reporter in a step, so a
+        # checkpoint created by one CheckpointReporter is stored on it, along
+        # with the step it was created at, for the others to reuse.  A State
+        # that is passed again at a later step gets a new checkpoint.
+
+        chk = None
+        shared = getattr(state, '_checkpoint', None)
+        if shared is not None and shared[0] == simulation.currentStep:
+            chk = shared[1]
+        if chk is not None:
+            # If the checkpoint is in another reporter's reusable buffer, copy
+            # it before handing it to a background thread.
+
+            if self._executor is not None and not isinstance(chk, bytes):
+                chk = bytes(chk)
+        elif self._mappedSize > 0 and hasattr(context, 'createCheckpointInto') and not self._hasOtherCheckpointReporters(simulation):
+            self._reportMapped(context)
+            return
+        else:
+            chk = self._createCheckpoint(context)
+            if state is not None:
+                state._checkpoint = (simulation.currentStep, chk)
+        if self._mapped:
+            # The size of this checkpoint is used as the initial size of the
+            # mapping in the next report.
+
+            self._mappedSize = len(chk)
+        if self._executor is None:
+            self._writeCheckpoint(chk)
         else:
-            # Replace the contents of the file.
+            self._pending = self._executor.submit(self._writeCheckpoint, chk)
+
+    def flush(self):
+        """Wait until the most recent checkpoint has been completely written.
+        If an error occurred while writing it, the exception is raised here.
+        This only has an effect if the reporter writes asynchronously.
+        """
+        if self._pending is not None:
+            pending = self._pending
+            self._pending = None
+            pending.result()
+
+    def close(self):
+        """Wait for any pending checkpoint to be written, and release the
+        background thread used for asynchronous writing.  The reporter should
+        not be used after it has been closed.
+        """
+        try:
+            self.flush()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def _hasOtherCheckpointReporters(self, simulation):
+        """Get whether any other CheckpointReporter could share checkpoints
+        with this one."""
+        return any(r is not self and isinstance(r, CheckpointReporter) for r in simulation.reporters)
+
+    def _createCheckpoint(self, context):
+        """Create a checkpoint, reusing the same buffer for every report when
+        the Context supports it."""
+        if not hasattr(context, 'createCheckpointInto'):
+            return context.createCheckpoint()
+        size = context.createCheckpointInto(self._buffer)
+        if size > len(self._buffer):
+            # The buffer is too small and could not be enlarged in place because
+            # a view of an earlier checkpoint still refers to it.
+
+            self._buffer = bytearray(size)
+            size = context.createCheckpointInto(self._buffer)
+        return memoryview(self._buffer)[:size]
+
+    def _writeCheckpoint(self, chk):
+        """Compress a checkpoint if requested and write it to the output."""
+        if self._compressor is not None:
+            chk = self._compressor(chk)
+        self._reportImpl(chk)
+
+    def _reportFilePath(self, chk):
+        """Write a checkpoint to a file specified by name, doing a safe save."""
+        fd, tempFilename = self._openTempFile()
+        try:
+            _rawWrite(fd, chk)
+            tempFilename = self._linkTempFile(fd, tempFilename)
+        finally:
+            os.close(fd)
+        self._replaceFile(tempFilename)
+
+    def _reportMapped(self, context):
+        """Create a checkpoint directly inside a memory mapping of a temporary
+        file, then move it to the output path.  This avoids copying the data
+        through an intermediate buffer."""
+        fd, tempFilename = self._openTempFile()
+        try:
+            capacity = self._mappedSize
+            while True:
+                # Allocate the blocks before mapping them.  If the disk is full
+                # this raises an OSError, while writing to unallocated pages of
+                # a sparse file would raise SIGBUS.
+
+                os.posix_fallocate(fd, 0, capacity)
+                with mmap.mmap(fd, capacity) as mapped:
+                    size = context.createCheckpointInto(mapped)
+                    if size <= capacity:
+                        mapped.flush()
+                        break
+                capacity = size
+            self._mappedSize = size
+            os.ftruncate(fd, size)
+            os.fsync(fd)
+            tempFilename = self._linkTempFile(fd, tempFilename)
+        finally:
+            os.close(fd)
+        self._replaceFile(tempFilename)
+
+    def _openTempFile(self):
+        """Open the file a checkpoint is written to before it replaces the
+        output file.  Where the platform supports it this is an unnamed file
+        in the output directory, so nothing is left behind if the process is
+        killed while writing.  Returns the file descriptor and the name of the
+        file, or None if it is unnamed."""
+        if hasattr(os, 'O_TMPFILE') and os.link in os.supports_dir_fd and os.path.isdir('/proc/self/fd'):
+            directory = os.path.dirname(os.path.abspath(self._file))
+            try:
+                return (os.open(directory, os.O_TMPFILE|os.O_RDWR, 0o666), None)
+            except OSError:
+                # The filesystem does not support unnamed files.
+                pass
+        tempFilename = self._file+".backup1"
+        return (os.open(tempFilename, os.O_RDWR|os.O_CREAT|os.O_TRUNC|getattr(os, 'O_BINARY', 0), 0o666), tempFilename)
+
+    def _linkTempFile(self, fd, tempFilename):
+        """Give a name to a completed file returned by _openTempFile() and
+        return it."""
+        if tempFilename is not None:
+            return tempFilename
+        tempFilename = self._file+".backup1"
+        if os.path.exists(tempFilename):
+            os.remove(tempFilename)
+        # Passing a directory descriptor makes os.link() use linkat() with
+        # AT_SYMLINK_FOLLOW, which is needed to link the /proc entry.
+
+        procFd = os.open('/proc/self/fd', os.O_RDONLY)
+        try:
+            os.link(str(fd), tempFilename, src_dir_fd=procFd, follow_symlinks=True)
+        finally:
+            os.close(procFd)
+        return tempFilename
+
+    def _replaceFile(self, tempFilename):
+        """Replace the output file with a completed temporary file."""
+        backupFilename = self._file+".backup2"
+        exists = os.path.exists(self._file)
+        if exists:
+            os.rename(self._file, backupFilename)
+        os.rename(tempFilename, self._file)
+        if exists:
+            os.remove(backupFilename)
+
+    def _reportFileObject(self, chk):
+        """Replace the contents of an open file object with a checkpoint."""
+        out = self._file
+        try:
+            fd = out.fileno()
+        except (AttributeError, OSError, ValueError):
+            # The file object is not backed by a file descriptor.
+            fd = None
+        if self._delta and self._lastCheckpoint is not None and fd is not None and hasattr(os, 'pwrite'):
+            self._writeDelta(fd, chk)
+            return
+        out.seek(0)
+        out.write(chk)
+        out.truncate()
+        out.flush()
+        if fd is not None:
+            os.fsync(fd)
+        if self._delta:
+            self._lastCheckpoint = bytearray(chk)
 
-            self._file.seek(0)
-            chk = simulation.context.createCheckpoint()
-            self._file.write(chk)
-            self._file.truncate()
-            self._file.flush()
+    def _writeDelta(self, fd, chk):
+        """Write only the blocks of a checkpoint that differ from the last one."""
+        last = self._lastCheckpoint
+        new = memoryview(chk)
+        size = len(new)
+        if len(last) > size:
+            os.ftruncate(fd, size)
+            del last[size:]
+        for start in range(0, size, _DELTA_CHUNK_SIZE):
+            end = min(start+_DELTA_CHUNK_SIZE, size)
+            block = new[start:end]
+            if last[start:end] != block:
+                os.pwrite(fd, block, start)
+                last[start:end] = block
+        os.fsync(fd)
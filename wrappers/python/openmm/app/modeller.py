@@ -304,16 +304,14 @@ class Modeller(object):
         # Determine the total charge of the system
         system = forcefield.createSystem(self.topology)
         for i in range(system.getNumForces()):
-            if isinstance(system.getForce(i), NonbondedForce):
-                nonbonded = system.getForce(i)
+            force = system.getForce(i)
+            if isinstance(force, NonbondedForce):
+                nonbonded = force
                 break
         else:
             raise ValueError('The ForceField does not specify a NonbondedForce')
 
-        totalCharge = 0.0
-        for i in range(nonbonded.getNumParticles()):
-            nb_i = nonbonded.getParticleParameters(i)
-            totalCharge += nb_i[0].value_in_unit(elementary_charge)
+        totalCharge = sum(nonbonded.getParticleCharges().value_in_unit(elementary_charge))
         # Round to nearest integer
         totalCharge = int(floor(0.5 + totalCharge))
 
@@ -483,8 +481,10 @@ class Modeller(object):
         system = forcefield.createSystem(self.topology)
         nonbonded = None
         for i in range(system.getNumForces()):
-            if isinstance(system.getForce(i), NonbondedForce):
-                nonbonded = system.getForce(i)
+            force = system.getForce(i)
+            if isinstance(force, NonbondedForce):
+                nonbonded = force
+                break
         if nonbonded is None:
             raise ValueError('The ForceField does not specify a NonbondedForce')
         cutoff = [waterRadius]*system.getNumParticles()
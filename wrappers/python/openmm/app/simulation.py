@@ -34,6 +34,8 @@ __version__ = "1.0"
 
 import openmm as mm
 import openmm.unit as unit
+from openmm.app.checkpointreporter import _decompressCheckpoint
+import os
 import sys
 from datetime import datetime, timedelta
 try:
@@ -271,30 +273,33 @@ class Simulation(object):
 
         Parameters
         ----------
-        file : string or file
+        file : string, os.PathLike, or file
             a File-like object to write the checkpoint to, or alternatively a
             filename
         """
-        if isinstance(file, str):
+        if isinstance(file, (str, os.PathLike)):
             with open(file, 'wb') as f:
                 f.write(self.context.createCheckpoint())
         else:
             file.write(self.context.createCheckpoint())
 
     def loadCheckpoint(self, file):
-        """Load a checkpoint file that was created with saveCheckpoint().
+        """Load a checkpoint file that was created with saveCheckpoint() or by a
+        CheckpointReporter.  Checkpoints compressed by a CheckpointReporter are
+        decompressed automatically.
 
         Parameters
         ----------
-        file : string or file
+        file : string, os.PathLike, or file
             a File-like object to load the checkpoint from, or alternatively a
             filename
         """
-        if isinstance(file, str):
+        if isinstance(file, (str, os.PathLike)):
             with open(file, 'rb') as f:
-                self.context.loadCheckpoint(f.read())
+                chk = f.read()
         else:
-            self.context.loadCheckpoint(file.read())
+            chk = file.read()
+        self.context.loadCheckpoint(_decompressCheckpoint(chk))
 
     def saveState(self, file):
         """Save the current state of the simulation to a file.
@@ -310,13 +315,13 @@ class Simulation(object):
 
         Parameters
         ----------
-        file : string or file
+        file : string, os.PathLike, or file
             a File-like object to write the state to, or alternatively a
             filename
         """
         state = self.context.getState(getPositions=True, getVelocities=True, getParameters=True, getIntegratorParameters=True)
         xml = mm.XmlSerializer.serialize(state)
-        if isinstance(file, str):
+        if isinstance(file, (str, os.PathLike)):
             with open(file, 'w') as f:
                 f.write(xml)
         else:
@@ -327,11 +332,11 @@ class Simulation(object):
 
         Parameters
         ----------
-        file : string or file
+        file : string, os.PathLike, or file
             a File-like object to load the state from, or alternatively a
             filename
         """
-        if isinstance(file, str):
+        if isinstance(file, (str, os.PathLike)):
             with open(file, 'r') as f:
                 xml = f.read()
         else:
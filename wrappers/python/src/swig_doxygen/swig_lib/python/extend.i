@@ -85,6 +85,42 @@ Returns: a string containing the checkpoint data
     return stream.str();
   }
 
+  %feature("docstring") createCheckpointInto "Create a checkpoint recording the current state of the Context, and copy
+it into a preallocated buffer.  This avoids allocating a new bytes object every time a checkpoint is created.
+If the buffer is a bytearray that is too small to hold the checkpoint, it is enlarged.  If any other buffer is
+too small, or the bytearray cannot be resized because it is in use, nothing is copied into it.  Compare the
+return value to the size of the buffer to determine whether the checkpoint was stored.
+
+Parameters:
+ - output (bytearray) a writable buffer to store the checkpoint data in
+
+Returns: the size of the checkpoint in bytes
+"
+  long long createCheckpointInto(PyObject* output) {
+    // Create the checkpoint before acquiring the buffer, so it is never left
+    // exported if serialization throws an exception.
+    std::stringstream stream(std::ios_base::in | std::ios_base::out | std::ios_base::binary);
+    self->createCheckpoint(stream);
+    long long size = stream.tellp();
+    if (size < 0)
+        throw OpenMMException("createCheckpointInto: failed to create checkpoint");
+    if (PyByteArray_Check(output) && PyByteArray_GET_SIZE(output) < size) {
+        // Enlarge the bytearray so the checkpoint does not need to be created again.
+        // This fails if it is currently exported, in which case it is left unchanged.
+        if (PyByteArray_Resize(output, (Py_ssize_t) size) != 0)
+            PyErr_Clear();
+    }
+    Py_buffer view;
+    if (PyObject_GetBuffer(output, &view, PyBUF_WRITABLE|PyBUF_SIMPLE) != 0) {
+        PyErr_Clear();
+        throw OpenMMException("createCheckpointInto: output must be a writable buffer");
+    }
+    if (size <= view.len)
+        stream.read((char*) view.buf, size);
+    PyBuffer_Release(&view);
+    return size;
+  }
+
   %feature ("docstring") loadCheckpoint "Load a checkpoint that was written by createCheckpoint().
 
 A checkpoint contains not only publicly visible data such as the particle positions and
@@ -234,7 +270,39 @@ Parameters:
         """
         return self.addException(particle1, particle2,
                                  chargeProd, rMin/RMIN_PER_SIGMA, epsilon)
+
+    def getParticleCharges(self, asNumpy=False):
+        """Get the charge of each particle with units.  This is much faster
+           than calling getParticleParameters() for every particle.
+           Returns a list of charges, unless asNumpy is True, in which
+           case a Numpy array will be returned.
+           """
+        if asNumpy:
+            charges = numpy.empty(self.getNumParticles(), numpy.float64)
+            self._getParticleChargesAsNumpy(charges)
+        else:
+            charges = self._getParticleCharges()
+        return charges*unit.elementary_charge
   %}
+
+  PyObject* _getParticleCharges() {
+      int numParticles = self->getNumParticles();
+      PyObject* charges = PyList_New(numParticles);
+      for (int i = 0; i < numParticles; i++) {
+          double charge, sigma, epsilon;
+          self->getParticleParameters(i, charge, sigma, epsilon);
+          PyList_SET_ITEM(charges, i, PyFloat_FromDouble(charge));
+      }
+      return charges;
+  }
+
+  void _getParticleChargesAsNumpy(PyObject* output) {
+      double* data = (double*) PyArray_DATA((PyArrayObject*) output);
+      for (int i = 0; i < self->getNumParticles(); i++) {
+          double sigma, epsilon;
+          self->getParticleParameters(i, data[i], sigma, epsilon);
+      }
+  }
 }
 
 %extend OpenMM::System {
@@ -166,6 +166,15 @@ class TestAPIUnits(unittest.TestCase):
         self.assertIs(sigma.unit, nanometers)
         self.assertIs(epsilon.unit, kilojoules_per_mole)
 
+        charges = force.getParticleCharges()
+        self.assertIs(charges.unit, elementary_charge)
+        self.assertEqual(charges[0], 1.0*elementary_charge)
+        self.assertEqual(charges[1], 1.0*coulombs)
+        charges = force.getParticleCharges(asNumpy=True)
+        self.assertIs(charges.unit, elementary_charge)
+        self.assertEqual(len(charges), 2)
+        self.assertEqual(charges[0], 1.0*elementary_charge)
+
         force.setCutoffDistance(10*angstroms)
         self.assertEqual(force.getCutoffDistance(), 1*nanometers)
         force.setCutoffDistance(1)
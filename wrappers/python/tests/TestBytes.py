@@ -23,6 +23,37 @@ class TestBytes(unittest.TestCase):
 
         assert newPositions == refPositions
 
+    def test_createCheckpointInto(self):
+        system = mm.System()
+        system.addParticle(1.0)
+        refPositions = [(0,0,0)]
+
+        platform = mm.Platform.getPlatformByName('Reference')
+        context = mm.Context(system, mm.VerletIntegrator(0), platform)
+        context.setPositions(refPositions)
+        chk = context.createCheckpoint()
+
+        # a buffer that is too small and cannot be resized should be left untouched
+        storage = bytearray(1)
+        size = context.createCheckpointInto(memoryview(storage))
+        assert size == len(chk)
+        assert storage == bytearray(1)
+
+        # a bytearray that is too small should be enlarged to hold the checkpoint
+        buffer = bytearray(1)
+        assert context.createCheckpointInto(buffer) == size
+        assert bytes(buffer) == chk
+
+        # a large enough buffer should receive the checkpoint
+        buffer = bytearray(size+10)
+        assert context.createCheckpointInto(buffer) == size
+        assert bytes(buffer[:size]) == chk
+        context.setPositions([(12345, 12345, 123451)])
+        context.loadCheckpoint(bytes(buffer[:size]))
+        newPositions = context.getState(getPositions=True).getPositions()._value
+
+        assert newPositions == refPositions
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,11 +1,54 @@
 import os
+import pathlib
 import unittest
 import tempfile
+from unittest import mock
 from openmm import app
+from openmm.app import checkpointreporter
 import openmm as mm
 from openmm import unit
 
 
+class FakeContext(object):
+    """A stand-in for a Context whose checkpoints are arbitrary byte strings."""
+    def __init__(self, checkpoint):
+        self.checkpoint = checkpoint
+
+    def createCheckpoint(self):
+        return self.checkpoint
+
+
+class FakeBufferContext(FakeContext):
+    """A FakeContext that also supports createCheckpointInto(), and records
+    how many checkpoints it created and the type of every buffer it stored
+    one in."""
+    def __init__(self, checkpoint):
+        super(FakeBufferContext, self).__init__(checkpoint)
+        self.calls = 0
+        self.buffers = []
+
+    def createCheckpointInto(self, output):
+        self.calls += 1
+        size = len(self.checkpoint)
+        if isinstance(output, bytearray) and len(output) < size:
+            try:
+                output.extend(bytes(size-len(output)))
+            except BufferError:
+                pass
+        if size <= len(output):
+            output[:size] = self.checkpoint
+            self.buffers.append(type(output))
+        return size
+
+
+class FakeSimulation(object):
+    """A stand-in for a Simulation that holds a FakeContext."""
+    def __init__(self, context):
+        self.context = context
+        self.currentStep = 0
+        self.reporters = []
+
+
 class TestCheckpointReporter(unittest.TestCase):
     def setUp(self):
         with open('systems/alanine-dipeptide-implicit.pdb') as f:
@@ -37,5 +80,262 @@ class TestCheckpointReporter(unittest.TestCase):
         newPositions = self.simulation.context.getState(getPositions=True).getPositions()
         self.assertSequenceEqual(positions, newPositions)
 
+    def test_delta(self):
+        """Test writing only the changed parts of the checkpoint to a file object."""
+        file = tempfile.NamedTemporaryFile(delete=False)
+        self.simulation.reporters.append(app.CheckpointReporter(file, 1, delta=True))
+        self.simulation.step(2)
+        positions = self.simulation.context.getState(getPositions=True).getPositions()
+        self.simulation.context.setPositions([mm.Vec3(0, 0, 0)] * len(positions))
+        file.close()
+        with open(file.name, 'rb') as f:
+            self.simulation.context.loadCheckpoint(f.read())
+        os.unlink(file.name)
+        newPositions = self.simulation.context.getState(getPositions=True).getPositions()
+        self.assertSequenceEqual(positions, newPositions)
+
+    def test_asynchronous(self):
+        """Test writing checkpoints to a file on a background thread."""
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'output.chk')
+            reporter = app.CheckpointReporter(filename, 1, asynchronous=True)
+            self.simulation.reporters.append(reporter)
+            self.simulation.step(2)
+            reporter.flush()
+            positions = self.simulation.context.getState(getPositions=True).getPositions()
+            self.simulation.context.setPositions([mm.Vec3(0, 0, 0)] * len(positions))
+            with open(filename, 'rb') as f:
+                self.simulation.context.loadCheckpoint(f.read())
+            reporter.close()
+        newPositions = self.simulation.context.getState(getPositions=True).getPositions()
+        self.assertSequenceEqual(positions, newPositions)
+
+    def test_asynchronousError(self):
+        """Test that an error writing a checkpoint in the background is raised by close()."""
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'missing', 'output.chk')
+            reporter = checkpointreporter.CheckpointReporter(filename, 1, asynchronous=True)
+            reporter.report(FakeSimulation(FakeContext(b'checkpoint')), None)
+            with self.assertRaises(OSError):
+                reporter.close()
+
+    def checkCompressed(self, method):
+        """Write a compressed checkpoint and load it with Simulation.loadCheckpoint()."""
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'output.chk')
+            self.simulation.reporters.append(app.CheckpointReporter(filename, 1, compress=method))
+            self.simulation.step(1)
+            with open(filename, 'rb') as f:
+                self.assertNotEqual(self.simulation.context.createCheckpoint(), f.read())
+            positions = self.simulation.context.getState(getPositions=True).getPositions()
+            self.simulation.context.setPositions([mm.Vec3(0, 0, 0)] * len(positions))
+            self.simulation.loadCheckpoint(filename)
+        newPositions = self.simulation.context.getState(getPositions=True).getPositions()
+        self.assertSequenceEqual(positions, newPositions)
+
+    @unittest.skipIf(not checkpointreporter.have_zstd, 'zstandard is not installed')
+    def test_compressZstd(self):
+        """Test writing checkpoints compressed with zstd."""
+        self.checkCompressed('zstd')
+
+    @unittest.skipIf(not checkpointreporter.have_lz4, 'lz4 is not installed')
+    def test_compressLz4(self):
+        """Test writing checkpoints compressed with lz4."""
+        self.checkCompressed('lz4')
+
+    def test_path(self):
+        """Test specifying the output file with a pathlib.Path."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / 'output.chk'
+            self.simulation.reporters.append(app.CheckpointReporter(path, 1))
+            self.simulation.step(1)
+            positions = self.simulation.context.getState(getPositions=True).getPositions()
+            self.simulation.context.setPositions([mm.Vec3(0, 0, 0)] * len(positions))
+            self.simulation.loadCheckpoint(path)
+        newPositions = self.simulation.context.getState(getPositions=True).getPositions()
+        self.assertSequenceEqual(positions, newPositions)
+
+    def test_multiple(self):
+        """Test several reporters writing the same checkpoint to different files."""
+        with tempfile.TemporaryDirectory() as directory:
+            filenames = [os.path.join(directory, name) for name in ['first.chk', 'second.chk', 'file.chk']]
+            with open(filenames[2], 'wb') as file:
+                self.simulation.reporters.append(app.CheckpointReporter(filenames[0], 1))
+                self.simulation.reporters.append(app.CheckpointReporter(filenames[1], 1))
+                self.simulation.reporters.append(app.CheckpointReporter(file, 1))
+                self.simulation.step(2)
+            checkpoints = []
+            for filename in filenames:
+                with open(filename, 'rb') as f:
+                    checkpoints.append(f.read())
+        self.assertEqual(checkpoints[0], checkpoints[1])
+        self.assertEqual(checkpoints[0], checkpoints[2])
+        positions = self.simulation.context.getState(getPositions=True).getPositions()
+        self.simulation.context.setPositions([mm.Vec3(0, 0, 0)] * len(positions))
+        self.simulation.context.loadCheckpoint(checkpoints[0])
+        newPositions = self.simulation.context.getState(getPositions=True).getPositions()
+        self.assertSequenceEqual(positions, newPositions)
+
+    def test_deltaBlocks(self):
+        """Test that delta mode only rewrites changed blocks, and handles checkpoints that grow and shrink."""
+        block = checkpointreporter._DELTA_CHUNK_SIZE
+        first = bytes(range(256))*(4*block//256)
+        changed = bytearray(first)
+        changed[block+10] ^= 0xFF
+        changed = bytes(changed)
+        checkpoints = [first, changed, changed+b'x'*(block//2), changed[:2*block+100], changed[:2*block+100]]
+        simulation = FakeSimulation(FakeContext(first))
+        file = tempfile.NamedTemporaryFile(delete=False)
+        reporter = checkpointreporter.CheckpointReporter(file, 1, delta=True)
+        # The expected offsets of the blocks written for each checkpoint, or
+        # None if the whole file is written.
+        expectedWrites = [None, [block], [4*block], [], []]
+        writes = []
+        pwrite = os.pwrite
+        def recordingPwrite(fd, data, offset):
+            writes.append(offset)
+            return pwrite(fd, data, offset)
+        with mock.patch.object(os, 'pwrite', side_effect=recordingPwrite):
+            for chk, expected in zip(checkpoints, expectedWrites):
+                del writes[:]
+                simulation.context.checkpoint = chk
+                reporter.report(simulation, None)
+                with open(file.name, 'rb') as f:
+                    self.assertEqual(chk, f.read())
+                if expected is not None:
+                    self.assertEqual(expected, writes)
+        file.close()
+        os.unlink(file.name)
+
+    @unittest.skipIf(not hasattr(os, 'posix_fallocate'), 'posix_fallocate is not available')
+    def test_mapped(self):
+        """Test creating checkpoints directly in a memory-mapped file."""
+        import mmap
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'output.chk')
+            context = FakeBufferContext(b'')
+            simulation = FakeSimulation(context)
+            reporter = checkpointreporter.CheckpointReporter(filename, 1, mapped=True)
+            simulation.reporters.append(reporter)
+
+            # The first report learns the size of the checkpoint, so later ones
+            # only need to create it twice when it grows.
+
+            expected = [(100, bytearray, 1), (100, mmap.mmap, 1), (3*mmap.PAGESIZE+5, mmap.mmap, 2), (10, mmap.mmap, 1)]
+            for size, bufferType, calls in expected:
+                context.checkpoint = os.urandom(size)
+                context.calls = 0
+                del context.buffers[:]
+                reporter.report(simulation, None)
+                self.assertEqual([bufferType], context.buffers)
+                self.assertEqual(calls, context.calls)
+                with open(filename, 'rb') as f:
+                    self.assertEqual(context.checkpoint, f.read())
+
+    @unittest.skipIf(not hasattr(os, 'posix_fallocate'), 'posix_fallocate is not available')
+    def test_mappedDiskFull(self):
+        """Test that running out of disk space in mapped mode raises an exception."""
+        import errno
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'output.chk')
+            simulation = FakeSimulation(FakeBufferContext(b'checkpoint'))
+            reporter = checkpointreporter.CheckpointReporter(filename, 1, mapped=True)
+            simulation.reporters.append(reporter)
+            reporter.report(simulation, None)
+            simulation.context.checkpoint = b'new checkpoint'
+            with mock.patch.object(os, 'posix_fallocate', side_effect=OSError(errno.ENOSPC, 'No space left on device')):
+                with self.assertRaises(OSError):
+                    reporter.report(simulation, None)
+            with open(filename, 'rb') as f:
+                self.assertEqual(b'checkpoint', f.read())
+
+    def test_bytesPath(self):
+        """Test specifying the output file with a path-like object that returns bytes."""
+        class BytesPath(object):
+            def __init__(self, path):
+                self.path = path
+            def __fspath__(self):
+                return os.fsencode(self.path)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'output.chk')
+            reporter = checkpointreporter.CheckpointReporter(BytesPath(filename), 1)
+            reporter.report(FakeSimulation(FakeContext(b'checkpoint')), None)
+            with open(filename, 'rb') as f:
+                self.assertEqual(b'checkpoint', f.read())
+
+    def test_shared(self):
+        """Test that reporters given the same State create only one checkpoint."""
+        class FakeState(object):
+            pass
+        with tempfile.TemporaryDirectory() as directory:
+            filenames = [os.path.join(directory, name) for name in ['first.chk', 'second.chk', 'async.chk']]
+            context = FakeBufferContext(b'checkpoint')
+            simulation = FakeSimulation(context)
+            simulation.reporters = [checkpointreporter.CheckpointReporter(filename, 1) for filename in filenames[:2]]
+            simulation.reporters.append(checkpointreporter.CheckpointReporter(filenames[2], 1, asynchronous=True))
+            for chk in [b'first', b'second']:
+                context.checkpoint = chk
+                del context.buffers[:]
+                simulation.currentStep += 1
+                state = FakeState()
+                for reporter in simulation.reporters:
+                    reporter.report(simulation, state)
+                simulation.reporters[-1].flush()
+                self.assertEqual(1, len(context.buffers))
+                for filename in filenames:
+                    with open(filename, 'rb') as f:
+                        self.assertEqual(chk, f.read())
+            simulation.reporters[-1].close()
+
+    def test_sharedStateReused(self):
+        """Test that a State passed again at a later step does not reuse the old checkpoint."""
+        class FakeState(object):
+            pass
+        with tempfile.TemporaryDirectory() as directory:
+            filenames = [os.path.join(directory, name) for name in ['first.chk', 'second.chk']]
+            context = FakeBufferContext(b'')
+            simulation = FakeSimulation(context)
+            simulation.reporters = [checkpointreporter.CheckpointReporter(filename, 100) for filename in filenames]
+            state = FakeState()
+            for step, chk in [(100, b'step 100'), (200, b'step 200')]:
+                simulation.currentStep = step
+                context.checkpoint = chk
+                context.calls = 0
+                for reporter in simulation.reporters:
+                    reporter.report(simulation, state)
+                self.assertEqual(1, context.calls)
+                for filename in filenames:
+                    with open(filename, 'rb') as f:
+                        self.assertEqual(chk, f.read())
+
+    def test_reuseBuffer(self):
+        """Test that each report creates the checkpoint only once, even when the buffer must grow."""
+        context = FakeBufferContext(b'')
+        simulation = FakeSimulation(context)
+        file = tempfile.TemporaryFile()
+        reporter = checkpointreporter.CheckpointReporter(file, 1)
+        for chk in [b'a'*100, b'b'*100, b'c'*1000, b'd'*10]:
+            context.checkpoint = chk
+            context.calls = 0
+            reporter.report(simulation, None)
+            self.assertEqual(1, context.calls)
+            file.seek(0)
+            self.assertEqual(chk, file.read())
+        file.close()
+
+    def test_describeNextReport(self):
+        """Test the number of steps until the next report as currentStep changes."""
+        simulation = FakeSimulation(FakeContext(b''))
+        interval = 10
+        file = tempfile.TemporaryFile()
+        reporter = checkpointreporter.CheckpointReporter(file, interval)
+        steps = [0, 1, 9, 10, 11, 20, 25, 29, 30, 5, 0, 10, 47, 3, 100, 99, 101]
+        for step in steps:
+            simulation.currentStep = step
+            report = reporter.describeNextReport(simulation)
+            self.assertEqual(interval - step%interval, report[0])
+            self.assertEqual((False, False, False, False), report[1:])
+        file.close()
+
 if __name__ == '__main__':
     unittest.main()